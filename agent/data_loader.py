@@ -1,25 +1,99 @@
+import os
+import tempfile
+from pathlib import Path
+
 import pandas as pd
 
+# Column dtypes for the raw sheets; keys missing from a sheet are ignored.
+SHEET_DTYPES = {
+    "entity": "category",
+    "account_category": "category",
+    "currency": "category",
+    "amount": "float64",
+    "rate_to_usd": "float64",
+    "cash_usd": "float64",
+}
+
+
+def _load_sheet(path, name: str):
+    """
+    Read one sheet, using a Parquet sidecar next to the workbook as a cache.
+
+    The sidecar (e.g. data.actuals.parquet) is reused while it is at least as
+    new as the workbook; otherwise (or if it can't be read) the sheet is
+    parsed from Excel and the sidecar is rewritten.
+    """
+    path = Path(path)
+    cache = path.with_suffix(f".{name}.parquet")
+    if cache.exists() and cache.stat().st_mtime >= path.stat().st_mtime:
+        try:
+            return pd.read_parquet(cache)
+        except (ImportError, OSError, ValueError):
+            # Unreadable sidecar (pyarrow missing, corrupt file, ...): re-parse
+            pass
+
+    df = pd.read_excel(
+        path,
+        sheet_name=name,
+        engine="calamine",
+        dtype=SHEET_DTYPES,
+        parse_dates=["month"],
+    )
+    _write_sidecar(df, cache)
+    return df
+
+
+def _write_sidecar(df: pd.DataFrame, cache: Path):
+    """
+    Write the Parquet sidecar atomically: to a temp file, then os.replace().
+
+    An interrupted write never leaves a truncated sidecar at the final path.
+    Caching is best effort (pyarrow missing, read-only checkout, full disk,
+    columns Parquet can't store, ...).
+    """
+    try:
+        fd, tmp = tempfile.mkstemp(dir=cache.parent, prefix=f".{cache.name}.", suffix=".tmp")
+    except OSError:
+        return
+    os.close(fd)
+    replaced = False
+    try:
+        df.to_parquet(tmp, engine="pyarrow", compression="zstd")
+        os.replace(tmp, cache)
+        replaced = True
+    except Exception:
+        # Any failure (incl. pyarrow type/conversion errors) just skips the cache
+        pass
+    finally:
+        if not replaced:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
 def load_data(filepath: str):
     """
     Load and normalize actuals, budget, cash, and fx data from Excel.
 
     Returns:
         combined_df (pd.DataFrame): unified actuals + budget data
-            Columns: [month, entity, account_category, type, amount_usd]
+            Columns: [month, entity, account_category, type, amount_usd,
+                      month_period, opex_sub]
         cash_df (pd.DataFrame): cash balances
             Columns: [month, entity, cash_usd]
     """
 
     # --- Load sheets ---
-    actuals = pd.read_excel(filepath, sheet_name="actuals")
-    budget = pd.read_excel(filepath, sheet_name="budget")
-    cash = pd.read_excel(filepath, sheet_name="cash")
-    fx = pd.read_excel(filepath, sheet_name="fx")
+    actuals = _load_sheet(filepath, "actuals")
+    budget = _load_sheet(filepath, "budget")
+    cash = _load_sheet(filepath, "cash")
+    fx = _load_sheet(filepath, "fx")
 
-    # --- Normalize months: force all to YYYY-MM period ---
+    # --- Normalize months to YYYY-MM (a no-op parse where parse_dates already
+    #     gave datetimes; unparseable cells become NaT) ---
     for df in [actuals, budget, cash, fx]:
-        df["month"] = pd.to_datetime(df["month"], format="%Y-%m", errors="coerce").dt.to_period("M")
+        df["month"] = pd.to_datetime(df["month"], errors="coerce").dt.to_period("M")
 
     # --- Ensure USD is present in FX table ---
     if not ((fx["currency"] == "USD") & (fx["rate_to_usd"] == 1.0)).any():
@@ -43,18 +117,35 @@ def load_data(filepath: str):
     budget["amount_usd"] = budget["amount"] * budget["rate_to_usd"]
     budget["type"] = "budget"
 
-    # --- Combine actuals + budget ---
-    combined = pd.concat([actuals, budget], ignore_index=True)
-    combined = combined[["month", "entity", "account_category", "type", "amount_usd"]]
+    # --- Combine actuals + budget (project first; amount/currency/rate are done with) ---
+    cols = ["month", "entity", "account_category", "type", "amount_usd"]
+    combined = pd.concat([actuals[cols], budget[cols]], ignore_index=True)
 
     # --- Clean cash ---
     cash["cash_usd"] = cash["cash_usd"].astype(float)
     cash = cash[["month", "entity", "cash_usd"]]
 
+    # --- Keep the period around for metric filters/groupbys ---
+    combined["month_period"] = combined["month"].astype("category")
+
     # --- Convert Period back to timestamp for easy plotting ---
     combined["month"] = combined["month"].dt.to_timestamp()
     cash["month"] = cash["month"].dt.to_timestamp()
 
+    # --- Low-cardinality labels as categoricals: integer-coded masks and groupbys ---
+    for col in ["entity", "account_category", "type"]:
+        combined[col] = combined[col].astype("category")
+
+    # --- Opex sub-category ("Opex:Sales" -> "Sales"), extracted once up front ---
+    labels = combined["account_category"].astype(str)
+    combined["opex_sub"] = (
+        labels.str.split(":").str[1].where(labels.str.startswith("Opex")).astype("category")
+    )
+
+    # --- Sort by month and index on it so metrics can slice a month directly ---
+    combined = combined.sort_values("month", kind="stable")
+    combined.index = pd.DatetimeIndex(combined["month"].to_numpy())
+
     return combined, cash
 
 
@@ -1,133 +1,124 @@
+import numpy as np
 import pandas as pd
 
-
-def get_revenue_vs_budget(combined_df: pd.DataFrame, month: str):
+__all__ = [
+    "get_revenue_vs_budget",
+    "get_gross_margin_trend",
+    "get_opex_breakdown",
+    "get_cash_runway",
+    "get_ebitda_trend",
+    "get_opex_ratio",
+    "get_revenue_growth",
+    "get_burn_multiple",
+    "get_entity_revenue",
+    "get_kpi_bundle",
+    "monthly_actuals_pivot",
+    "RUNWAY_NOT_BURNING",
+]
+
+# runway_months reported by get_cash_runway() when cash is flat or growing
+RUNWAY_NOT_BURNING = "∞ (profitable / not burning)"
+
+
+def _month_period(df: pd.DataFrame) -> pd.Series:
     """
-    Calculate revenue vs budget for a given month.
-
-    Args:
-        combined_df: DataFrame from load_data()
-        month: e.g., "2023-01"
+    Monthly period of each row, as a Series named "month".
 
-    Returns:
-        dict with actual, budget, variance, variance_pct
+    Uses the `month_period` column precomputed by load_data() when present,
+    so hot filters don't rebuild a PeriodArray on every call.
     """
-    month = pd.to_datetime(month).to_period("M")
-    data = combined_df[
-        (combined_df["month"].dt.to_period("M") == month)
-        & (combined_df["account_category"] == "Revenue")
-    ]
+    if "month_period" in df.columns:
+        return df["month_period"].rename("month")
+    return df["month"].dt.to_period("M")
 
-    actual = data.loc[data["type"] == "actual", "amount_usd"].sum()
-    budget = data.loc[data["type"] == "budget", "amount_usd"].sum()
 
-    variance = actual - budget
-    variance_pct = (variance / budget * 100) if budget != 0 else None
+def _month_rows(df: pd.DataFrame, month: pd.Period) -> pd.DataFrame:
+    """
+    Rows of df that fall in `month`.
 
-    return {
-        "month": str(month),
-        "actual": round(actual, 2),
-        "budget": round(budget, 2),
-        "variance": round(variance, 2),
-        "variance_pct": round(variance_pct, 2) if variance_pct is not None else None,
-    }
+    load_data() returns frames sorted by month with a DatetimeIndex, so the
+    month is a binary-searched slice; other frames fall back to a mask that
+    compares the raw datetime64 values (no PeriodArray is built).
+    """
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.is_monotonic_increasing:
+        return df.loc[month.start_time:month.end_time]
+    months = df["month"].to_numpy()
+    start = np.datetime64(month.start_time)
+    end = np.datetime64((month + 1).start_time)
+    return df[(months >= start) & (months < end)]
 
 
-def get_gross_margin_trend(combined_df: pd.DataFrame, n_months: int = 3):
+def _opex_mask(account_category: pd.Series) -> np.ndarray:
     """
-    Compute Gross Margin % trend for last n_months.
+    Boolean mask of "Opex*" rows.
 
-    Returns:
-        DataFrame with [month, revenue, cogs, gm_pct]
+    For categoricals the prefix test runs once per category and rows are
+    matched on their integer codes; other dtypes fall back to str.startswith.
     """
-    df = combined_df.copy()
-    df["month"] = df["month"].dt.to_period("M")
+    if isinstance(account_category.dtype, pd.CategoricalDtype):
+        opex_codes = np.flatnonzero(account_category.cat.categories.str.startswith("Opex"))
+        return np.isin(account_category.cat.codes.to_numpy(), opex_codes)
+    return account_category.str.startswith("Opex", na=False).to_numpy(dtype=bool)
 
-    # Aggregate actuals only
-    df = df[df["type"] == "actual"]
-
-    summary = (
-        df.groupby(["month", "account_category"])["amount_usd"]
-        .sum()
-        .unstack(fill_value=0)
-    )
-    summary["revenue"] = summary.get("Revenue", 0)
-    summary["cogs"] = summary.get("COGS", 0)
-    summary["gm_pct"] = (
-        (summary["revenue"] - summary["cogs"]) / summary["revenue"] * 100
-    ).replace([pd.NA, float("inf")], 0)
 
-    trend = (
-        summary[["revenue", "cogs", "gm_pct"]]
-        .reset_index()
-        .sort_values("month")
-        .tail(n_months)
-    )
-    trend["month"] = trend["month"].astype(str)
+def _avg_burn_last_n(cash: np.ndarray, n: int):
+    """
+    Average monthly burn over the last n month-to-month changes in cash.
 
-    return trend
+    Only the tail of the (month-sorted) balances is read. Changes touching a
+    missing balance are skipped, like Series.mean(); returns NaN when no
+    change is left.
+    """
+    deltas = np.diff(cash[-(n + 1):].astype("float64"))
+    if np.isnan(deltas).all():  # also true when there are no deltas
+        return np.nan
+    return -np.nanmean(deltas)  # negative change = burn
 
 
-def get_opex_breakdown(combined_df: pd.DataFrame, month: str):
+def monthly_actuals_pivot(combined_df: pd.DataFrame) -> pd.DataFrame:
     """
-    Opex breakdown by category for a given month.
+    Actual amount_usd summed per month (rows) and account_category (columns).
 
-    Returns:
-        DataFrame with [category, amount_usd]
+    Cells are NaN where a month has no rows for that category, so callers can
+    tell "no rows" apart from a zero total. The trend metrics all derive from
+    this one groupby.
     """
-    month = pd.to_datetime(month).to_period("M")
-    df = combined_df[
-        (combined_df["month"].dt.to_period("M") == month)
-        & (combined_df["type"] == "actual")
-        & (combined_df["account_category"].str.startswith("Opex"))
-    ]
-
-    # Extract category name after "Opex:"
-    df = df.assign(category=df["account_category"].str.split(":").str[1])
-    breakdown = (
-        df.groupby("category")["amount_usd"]
+    # Mask just the three columns involved rather than materializing a filtered
+    # copy of the whole frame
+    actual = (combined_df["type"] == "actual").to_numpy()
+    amounts = combined_df["amount_usd"][actual]
+    keys = [_month_period(combined_df)[actual], combined_df["account_category"][actual]]
+    return (
+        amounts.groupby(keys, sort=False, observed=True)
         .sum()
-        .reset_index()
-        .sort_values("amount_usd", ascending=False)
+        .unstack()
+        .sort_index()
     )
 
-    return breakdown
 
+def _category_total(summary: pd.DataFrame, category: str) -> pd.Series:
+    """Column of a monthly pivot with months lacking rows as 0."""
+    if category in summary.columns:
+        return summary[category].fillna(0)
+    return pd.Series(0.0, index=summary.index)
 
-def get_cash_runway(combined_df, cash_df):
-    cash_df = cash_df.sort_values("month")
-    latest = cash_df.iloc[-1]
-    latest_month = latest["month"].strftime("%Y-%m")  # format nicely
-    cash_now = latest["cash_usd"]
 
-    # Compute avg burn (last 3 months)
-    cash_df["delta"] = cash_df["cash_usd"].diff()
-    recent_deltas = cash_df["delta"].tail(3)
-    avg_burn = -recent_deltas.mean()  # negative change = burn
-
-    if avg_burn <= 0 or pd.isna(avg_burn):
-        runway = "∞ (profitable / not burning)"
-        avg_burn_val = 0
-    else:
-        months_left = round(cash_now / avg_burn, 1)
-        runway = months_left 
-        avg_burn_val = avg_burn
+# ---------------- CORE METRICS ---------------- #
 
-    return {
-        "latest_month": latest_month,
-        "cash_now": cash_now,
-        "avg_burn": avg_burn_val,
-        "runway_months": runway,
-    }
+def get_revenue_vs_budget(combined_df: pd.DataFrame, month: str):
+    """
+    Calculate revenue vs budget for a given month.
 
-# ---------------- EXISTING METRICS ---------------- #
+    Args:
+        combined_df: DataFrame from load_data()
+        month: e.g., "2023-01"
 
-def get_revenue_vs_budget(combined_df: pd.DataFrame, month: str):
+    Returns:
+        dict with actual, budget, variance, variance_pct
+    """
     month = pd.to_datetime(month).to_period("M")
-    data = combined_df[
-        (combined_df["month"].dt.to_period("M") == month)
-        & (combined_df["account_category"] == "Revenue")
-    ]
+    data = _month_rows(combined_df, month)
+    data = data[data["account_category"] == "Revenue"]
 
     actual = data.loc[data["type"] == "actual", "amount_usd"].sum()
     budget = data.loc[data["type"] == "budget", "amount_usd"].sum()
@@ -145,23 +136,25 @@ def get_revenue_vs_budget(combined_df: pd.DataFrame, month: str):
 
 
 def get_gross_margin_trend(combined_df: pd.DataFrame, n_months: int = 3):
-    df = combined_df.copy()
-    df["month"] = df["month"].dt.to_period("M")
-    df = df[df["type"] == "actual"]
+    """
+    Compute Gross Margin % trend for last n_months.
 
-    summary = (
-        df.groupby(["month", "account_category"])["amount_usd"]
-        .sum()
-        .unstack(fill_value=0)
-    )
-    summary["revenue"] = summary.get("Revenue", 0)
-    summary["cogs"] = summary.get("COGS", 0)
-    summary["gm_pct"] = (
-        (summary["revenue"] - summary["cogs"]) / summary["revenue"] * 100
-    ).replace([pd.NA, float("inf")], 0)
+    Returns:
+        DataFrame with [month, revenue, cogs, gm_pct]
+    """
+    summary = monthly_actuals_pivot(combined_df)
+    revenue = _category_total(summary, "Revenue")
+    cogs = _category_total(summary, "COGS")
+
+    # GM% is 0 for months without revenue; divide only where revenue != 0
+    num = (revenue - cogs).to_numpy(dtype="float64")
+    den = revenue.to_numpy(dtype="float64")
+    gm_pct = np.zeros_like(num)
+    np.divide(num, den, out=gm_pct, where=den != 0)
+    gm_pct *= 100
 
     trend = (
-        summary[["revenue", "cogs", "gm_pct"]]
+        pd.DataFrame({"revenue": revenue, "cogs": cogs, "gm_pct": gm_pct})
         .reset_index()
         .sort_values("month")
         .tail(n_months)
@@ -172,34 +165,43 @@ def get_gross_margin_trend(combined_df: pd.DataFrame, n_months: int = 3):
 
 
 def get_opex_breakdown(combined_df: pd.DataFrame, month: str):
+    """
+    Opex breakdown by category for a given month.
+
+    Returns:
+        DataFrame with [category, amount_usd]
+    """
     month = pd.to_datetime(month).to_period("M")
-    df = combined_df[
-        (combined_df["month"].dt.to_period("M") == month)
-        & (combined_df["type"] == "actual")
-        & (combined_df["account_category"].str.startswith("Opex"))
-    ]
-    df = df.assign(category=df["account_category"].str.split(":").str[1])
+    df = _month_rows(combined_df, month)
+    df = df[(df["type"] == "actual") & _opex_mask(df["account_category"])]
+
+    # Category name after "Opex:" is pre-extracted by load_data(); derive it
+    # for frames that don't carry it
+    if "opex_sub" in df.columns:
+        category = df["opex_sub"]
+    else:
+        category = df["account_category"].str.split(":").str[1]
     breakdown = (
-        df.groupby("category")["amount_usd"]
+        df.groupby(category.rename("category"), sort=False, observed=True)["amount_usd"]
         .sum()
         .reset_index()
         .sort_values("amount_usd", ascending=False)
     )
+
     return breakdown
 
 
 def get_cash_runway(combined_df, cash_df):
     cash_df = cash_df.sort_values("month")
     latest = cash_df.iloc[-1]
-    latest_month = latest["month"].strftime("%Y-%m")
+    latest_month = latest["month"].strftime("%Y-%m")  # format nicely
     cash_now = latest["cash_usd"]
 
-    cash_df["delta"] = cash_df["cash_usd"].diff()
-    recent_deltas = cash_df["delta"].tail(3)
-    avg_burn = -recent_deltas.mean()
+    # Compute avg burn (last 3 months)
+    avg_burn = _avg_burn_last_n(cash_df["cash_usd"].to_numpy(), 3)
 
     if avg_burn <= 0 or pd.isna(avg_burn):
-        runway = "∞ (profitable / not burning)"
+        runway = RUNWAY_NOT_BURNING
         avg_burn_val = 0
     else:
         months_left = round(cash_now / avg_burn, 1)
@@ -220,18 +222,10 @@ def get_ebitda_trend(combined_df: pd.DataFrame, n_months: int = 3):
     """
     EBITDA = Revenue - COGS - Opex
     """
-    df = combined_df.copy()
-    df["month"] = df["month"].dt.to_period("M")
-    df = df[df["type"] == "actual"]
-
-    summary = (
-        df.groupby(["month", "account_category"])["amount_usd"]
-        .sum()
-        .unstack(fill_value=0)
-    )
-    revenue = summary.get("Revenue", 0)
-    cogs = summary.get("COGS", 0)
-    opex = summary.filter(like="Opex").sum(axis=1)
+    summary = monthly_actuals_pivot(combined_df)
+    revenue = _category_total(summary, "Revenue")
+    cogs = _category_total(summary, "COGS")
+    opex = summary.filter(like="Opex").sum(axis=1)  # NaN-skipping sum
     ebitda = revenue - cogs - opex
 
     trend = (
@@ -249,12 +243,11 @@ def get_opex_ratio(combined_df: pd.DataFrame, month: str):
     Opex Ratio = Total Opex / Revenue
     """
     month = pd.to_datetime(month).to_period("M")
-    df = combined_df[
-        (combined_df["month"].dt.to_period("M") == month) & (combined_df["type"] == "actual")
-    ]
+    df = _month_rows(combined_df, month)
+    df = df[df["type"] == "actual"]
 
     revenue = df.loc[df["account_category"] == "Revenue", "amount_usd"].sum()
-    opex = df.loc[df["account_category"].str.startswith("Opex"), "amount_usd"].sum()
+    opex = df.loc[_opex_mask(df["account_category"]), "amount_usd"].sum()
     ratio = (opex / revenue * 100) if revenue != 0 else None
 
     return {
@@ -269,11 +262,14 @@ def get_revenue_growth(combined_df: pd.DataFrame, n_months: int = 3):
     """
     MoM Revenue Growth %
     """
-    df = combined_df.copy()
-    df["month"] = df["month"].dt.to_period("M")
-    df = df[(df["type"] == "actual") & (df["account_category"] == "Revenue")]
-
-    revenue = df.groupby("month")["amount_usd"].sum().reset_index()
+    summary = monthly_actuals_pivot(combined_df)
+    # Only months with actual revenue rows; a COGS/Opex-only month is skipped,
+    # not counted as zero revenue
+    if "Revenue" in summary.columns:
+        revenue = summary["Revenue"].dropna()
+    else:
+        revenue = pd.Series(dtype="float64", index=summary.index[:0])
+    revenue = revenue.rename("amount_usd").reset_index()
     revenue["growth_pct"] = revenue["amount_usd"].pct_change() * 100
 
     trend = revenue.tail(n_months).copy()
@@ -293,9 +289,7 @@ def get_burn_multiple(combined_df: pd.DataFrame, cash_df: pd.DataFrame, n_months
 
     # Burn
     cash_df = cash_df.sort_values("month")
-    cash_df["delta"] = cash_df["cash_usd"].diff()
-    recent_deltas = cash_df["delta"].tail(n_months)
-    avg_burn = -recent_deltas.mean()
+    avg_burn = _avg_burn_last_n(cash_df["cash_usd"].to_numpy(), n_months)
 
     burn_multiple = (avg_burn / net_new_revenue) if net_new_revenue > 0 else None
     return {
@@ -310,11 +304,44 @@ def get_entity_revenue(combined_df: pd.DataFrame, month: str):
     Revenue split by entity
     """
     month = pd.to_datetime(month).to_period("M")
-    df = combined_df[
-        (combined_df["month"].dt.to_period("M") == month)
-        & (combined_df["type"] == "actual")
-        & (combined_df["account_category"] == "Revenue")
-    ]
-    breakdown = df.groupby("entity")["amount_usd"].sum().reset_index()
+    df = _month_rows(combined_df, month)
+    df = df[(df["type"] == "actual") & (df["account_category"] == "Revenue")]
+    breakdown = (
+        df.groupby("entity", sort=False, observed=True)["amount_usd"].sum().reset_index()
+    )
     breakdown = breakdown.sort_values("amount_usd", ascending=False)
     return breakdown
+
+
+def get_kpi_bundle(combined_df: pd.DataFrame, month: str):
+    """
+    Headline KPIs for one month (revenue vs budget, total Opex) from a
+    single groupby over that month's rows.
+
+    GM % is left to get_gross_margin_trend(), which reports the latest month
+    that has actuals even when the budget runs further ahead.
+
+    Returns:
+        dict with month, revenue_actual, revenue_budget, revenue_variance,
+        opex_total
+    """
+    month = pd.to_datetime(month).to_period("M")
+    df = _month_rows(combined_df, month)
+    grouped = df.groupby(["type", "account_category"], sort=False, observed=True)
+    totals = grouped["amount_usd"].sum()
+    if "actual" in totals.index.get_level_values("type"):
+        actual = totals.loc["actual"]
+    else:
+        actual = totals.iloc[:0].droplevel("type")
+
+    rev_actual = actual.get("Revenue", 0.0)
+    rev_budget = totals.get(("budget", "Revenue"), 0.0)
+    opex = float(actual[_opex_mask(actual.index.to_series())].sum())
+
+    return {
+        "month": str(month),
+        "revenue_actual": round(rev_actual, 2),
+        "revenue_budget": round(rev_budget, 2),
+        "revenue_variance": round(rev_actual - rev_budget, 2),
+        "opex_total": round(opex, 2),
+    }
@@ -0,0 +1,48 @@
+"""
+Streamlit-cached versions of the metric functions used by app.py.
+
+Streamlit reruns the whole script on every widget interaction; caching the
+metrics turns those reruns into cache lookups instead of fresh groupbys.
+"""
+import pandas as pd
+import streamlit as st
+
+from agent import metrics
+
+
+def _frame_key(df: pd.DataFrame):
+    """
+    Cheap cache key for the loaded frames: shape + last month.
+
+    The data is loaded once per process, so this is enough to tell frames
+    apart without hashing every row on each rerun.
+    """
+    return (df.shape, df["month"].iloc[-1])
+
+
+_HASH_FUNCS = {pd.DataFrame: _frame_key}
+
+
+@st.cache_data(show_spinner=False, hash_funcs=_HASH_FUNCS)
+def get_revenue_vs_budget(combined_df: pd.DataFrame, month: str):
+    return metrics.get_revenue_vs_budget(combined_df, month)
+
+
+@st.cache_data(show_spinner=False, hash_funcs=_HASH_FUNCS)
+def get_gross_margin_trend(combined_df: pd.DataFrame, n_months: int = 3):
+    return metrics.get_gross_margin_trend(combined_df, n_months)
+
+
+@st.cache_data(show_spinner=False, hash_funcs=_HASH_FUNCS)
+def get_opex_breakdown(combined_df: pd.DataFrame, month: str):
+    return metrics.get_opex_breakdown(combined_df, month)
+
+
+@st.cache_data(show_spinner=False, hash_funcs=_HASH_FUNCS)
+def get_cash_runway(combined_df: pd.DataFrame, cash_df: pd.DataFrame):
+    return metrics.get_cash_runway(combined_df, cash_df)
+
+
+@st.cache_data(show_spinner=False, hash_funcs=_HASH_FUNCS)
+def get_kpi_bundle(combined_df: pd.DataFrame, month: str):
+    return metrics.get_kpi_bundle(combined_df, month)
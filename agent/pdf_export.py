@@ -1,10 +1,53 @@
+from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
-import matplotlib.pyplot as plt
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.linecharts import HorizontalLineChart
+from reportlab.graphics.widgets.markers import makeMarker
 import pandas as pd
-import io
+
+
+def _build_rev_chart(actual, budget, month):
+    """Revenue vs Budget bar chart as a native reportlab (vector) Drawing."""
+    chart = Drawing(400, 250)
+    bars = VerticalBarChart()
+    bars.x, bars.y, bars.width, bars.height = 60, 30, 320, 170
+    bars.data = [(actual, budget)]
+    bars.categoryAxis.categoryNames = ["Actual", "Budget"]
+    bars.valueAxis.valueMin = 0
+    bars.valueAxis.labelTextFormat = lambda v: f"{v:,.0f}"
+    bars.bars[(0, 0)].fillColor = colors.HexColor("#2b83ba")
+    bars.bars[(0, 1)].fillColor = colors.HexColor("#abdda4")
+    bars.barLabelFormat = lambda v: f"${v:,.0f}"
+    bars.barLabels.nudge = 8
+    chart.add(bars)
+    chart.add(String(200, 230, f"Revenue vs Budget ({month})", textAnchor="middle"))
+    return chart
+
+
+def _build_cash_chart(cash_df):
+    """Cash balance line chart as a native reportlab (vector) Drawing."""
+    chart = Drawing(400, 250)
+    line = HorizontalLineChart()
+    line.x, line.y, line.width, line.height = 60, 50, 320, 160
+    line.data = [tuple(cash_df["cash_usd"])]
+    # Label every third month so the axis stays readable
+    line.categoryAxis.categoryNames = [
+        m.strftime("%Y-%m") if i % 3 == 0 else "" for i, m in enumerate(cash_df["month"])
+    ]
+    line.categoryAxis.labels.angle = 45
+    line.categoryAxis.labels.boxAnchor = "ne"
+    line.categoryAxis.labels.fontSize = 7
+    line.valueAxis.labelTextFormat = lambda v: f"{v:,.0f}"
+    line.lines[0].strokeColor = colors.HexColor("#2b83ba")
+    line.lines[0].symbol = makeMarker("FilledCircle", size=3)
+    chart.add(line)
+    chart.add(String(200, 230, "Cash Balance Trend", textAnchor="middle"))
+    return chart
+
 
 def export_pdf(filepath, combined_df, cash_df):
     """
@@ -29,19 +72,6 @@ def export_pdf(filepath, combined_df, cash_df):
     variance = actual - budget
     variance_pct = (variance / budget * 100) if budget != 0 else 0
 
-    # --- Revenue vs Budget chart ---
-    fig, ax = plt.subplots()
-    ax.bar(["Actual", "Budget"], [actual, budget], color=["#2b83ba", "#abdda4"])
-    ax.set_title(f"Revenue vs Budget ({latest_month})")
-    ax.set_ylabel("USD")
-    for i, v in enumerate([actual, budget]):
-        ax.text(i, v + (v*0.02), f"${v:,.0f}", ha="center")
-
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    buf.seek(0)
-    plt.close(fig)
-
     # --- Add to PDF ---
     elements.append(Paragraph(f"<b>Revenue vs Budget ({latest_month})</b>", styles['Title']))
     elements.append(Paragraph(
@@ -49,28 +79,17 @@ def export_pdf(filepath, combined_df, cash_df):
         styles['Normal']
     ))
     elements.append(Spacer(1, 12))
-    elements.append(Image(buf, width=400, height=250))
+    elements.append(_build_rev_chart(actual, budget, latest_month))
     elements.append(Spacer(1, 24))
 
     # --- Cash trend ---
     latest_cash_month = cash_df["month"].max().to_period("M")
     cash_now = cash_df.loc[cash_df["month"].dt.to_period("M") == latest_cash_month, "cash_usd"].sum()
 
-    fig, ax = plt.subplots()
-    ax.plot(cash_df["month"], cash_df["cash_usd"], marker="o")
-    ax.set_title("Cash Balance Trend")
-    ax.set_ylabel("USD")
-    plt.xticks(rotation=45)
-
-    buf2 = io.BytesIO()
-    plt.savefig(buf2, format="png")
-    buf2.seek(0)
-    plt.close(fig)
-
     elements.append(Paragraph("<b>Cash Balance Trend</b>", styles['Title']))
     elements.append(Paragraph(f"Current Cash Balance ({latest_cash_month}) = ${cash_now:,.0f}", styles['Normal']))
     elements.append(Spacer(1, 12))
-    elements.append(Image(buf2, width=400, height=250))
+    elements.append(_build_cash_chart(cash_df))
 
     # --- Build PDF ---
     doc.build(elements)
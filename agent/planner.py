@@ -1,6 +1,24 @@
 import re
+from functools import lru_cache
+
 import pandas as pd
 
+_YM_RE = re.compile(r"(\d{4})[-/](\d{1,2})")
+_MONTH_RE = re.compile(
+    r"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+(\d{4})", re.IGNORECASE
+)
+_N_MONTHS_RE = re.compile(r"last\s+(\d+)\s+month", re.IGNORECASE)
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+
+@lru_cache(maxsize=64)
+def _format_month(year: int, month: int) -> str:
+    return pd.Period(year=year, month=month, freq="M").strftime("%Y-%m")
+
+
 def classify_query(query: str):
     """
     Very simple rule-based classifier.
@@ -26,20 +44,14 @@ def extract_month(query: str):
     Returns YYYY-MM string or None if not found.
     """
     # Try to find patterns like YYYY-MM
-    m = re.search(r"(\d{4})[-/](\d{1,2})", query)
+    m = _YM_RE.search(query)
     if m:
-        year, month = int(m.group(1)), int(m.group(2))
-        return pd.Period(year=year, month=month, freq="M").strftime("%Y-%m")
+        return _format_month(int(m.group(1)), int(m.group(2)))
 
     # Try to find formats like 'June 2025'
-    m = re.search(r"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+(\d{4})", query.lower())
+    m = _MONTH_RE.search(query)
     if m:
-        month_str, year = m.group(1), int(m.group(2))
-        month_num = {
-            "jan":1,"feb":2,"mar":3,"apr":4,"may":5,"jun":6,
-            "jul":7,"aug":8,"sep":9,"oct":10,"nov":11,"dec":12
-        }[month_str[:3]]
-        return pd.Period(year=year, month=month_num, freq="M").strftime("%Y-%m")
+        return _format_month(int(m.group(2)), _MONTHS[m.group(1).lower()])
 
     return None
 
@@ -48,7 +60,7 @@ def extract_n_months(query: str, default: int = 3):
     """
     Detect if CFO asked for 'last N months'.
     """
-    m = re.search(r"last\s+(\d+)\s+month", query.lower())
+    m = _N_MONTHS_RE.search(query)
     if m:
         return int(m.group(1))
     return default
@@ -4,17 +4,18 @@ import plotly.express as px
 import tempfile
 
 from agent.data_loader import load_data
-from agent.metrics import (
+from agent.metrics_cached import (
     get_revenue_vs_budget,
     get_gross_margin_trend,
     get_opex_breakdown,
     get_cash_runway,
+    get_kpi_bundle,
 )
 from agent.planner import classify_query, extract_month, extract_n_months
 from agent.pdf_export import export_pdf
 
-# --- Load data once ---
-@st.cache_data
+# --- Load data once per process; the frames are shared read-only across reruns ---
+@st.cache_resource
 def get_data():
     combined, cash = load_data("fixtures/data.xlsx")
     return combined, cash
@@ -28,25 +29,24 @@ st.caption("Talk to your financials *or* explore an always-on analytics dashboar
 
 # ----------------- KPI Cards -----------------
 latest_month = combined_df["month"].max().strftime("%Y-%m")
-rvb_latest = get_revenue_vs_budget(combined_df, latest_month)
+kpis = get_kpi_bundle(combined_df, latest_month)
 gm_latest = get_gross_margin_trend(combined_df, 1)
 gm_value = f"{gm_latest['gm_pct'].iloc[-1]:.1f}%" if not gm_latest.empty else "N/A"
-opex_latest = get_opex_breakdown(combined_df, latest_month)["amount_usd"].sum()
 cash_latest = get_cash_runway(combined_df, cash_df)
 
 kpi1, kpi2, kpi3, kpi4 = st.columns(4)
 with kpi1:
-    delta = rvb_latest["variance"]
+    delta = kpis["revenue_variance"]
     st.metric(
         label=f"💰 Revenue ({latest_month})",
-        value=f"${rvb_latest['actual']:,.0f}",
+        value=f"${kpis['revenue_actual']:,.0f}",
         delta=f"{delta:,.0f} vs Budget",
         delta_color="normal",
     )
 with kpi2:
     st.metric(label="📈 Gross Margin", value=gm_value)
 with kpi3:
-    st.metric(label=f"🏢 Opex ({latest_month})", value=f"${opex_latest:,.0f}")
+    st.metric(label=f"🏢 Opex ({latest_month})", value=f"${kpis['opex_total']:,.0f}")
 with kpi4:
     st.metric(
         label="💵 Cash Runway",
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+# Month-start timestamps used by the fake frames (precomputed, no string parsing)
+MONTHS = np.array(["2023-01-01", "2023-02-01", "2023-03-01"], dtype="datetime64[ns]")
+
+# Raw column arrays of the fake combined frame, shared so tests can extend them
+COMBINED_COLUMNS = {
+    "month": np.repeat(MONTHS, [4, 4, 3]),
+    "entity": np.array(["ParentCo"] * 11, dtype=object),
+    "account_category": np.array([
+        "Revenue", "Revenue", "COGS", "Opex:Sales",   # 2023-01
+        "Revenue", "Revenue", "COGS", "Opex:Sales",   # 2023-02
+        "Revenue", "COGS", "Opex:Sales",              # 2023-03
+    ], dtype=object),
+    "type": np.array([
+        "actual", "budget", "actual", "actual",
+        "actual", "budget", "actual", "actual",
+        "actual", "actual", "actual",
+    ], dtype=object),
+    "amount_usd": np.array(
+        [1000, 1200, 400, 200, 1500, 1400, 500, 300, 800, 400, 600], dtype=np.int64
+    ),
+}
+COMBINED_CATEGORIES = {
+    "entity": ["ParentCo"],
+    "account_category": ["Revenue", "COGS", "Opex:Sales"],
+    "type": ["actual", "budget"],
+}
+
+
+def make_fake_data():
+    # Built column-wise from typed arrays: no row->column transpose, no dtype
+    # inference. Labels are categoricals, like the frames load_data() returns.
+    df = pd.DataFrame({
+        name: (
+            pd.Categorical(values, categories=COMBINED_CATEGORIES[name])
+            if name in COMBINED_CATEGORIES
+            else values
+        )
+        for name, values in COMBINED_COLUMNS.items()
+    })
+
+    cash_df = make_cash_df([10000, 9000, 8000])
+
+    # Sorted by (entity, month) once on a fresh RangeIndex, so metrics take
+    # their plain-frame branches (see shape_like_load_data() for the
+    # load_data() layout); mergesort keeps the within-month row order stable
+    keys = ["entity", "month"]
+    return (
+        df.sort_values(keys, kind="mergesort", ignore_index=True),
+        cash_df.sort_values(keys, kind="mergesort", ignore_index=True),
+    )
+
+
+def make_cash_df(values):
+    """Fresh cash frame with one balance per month in MONTHS."""
+    return pd.DataFrame({
+        "month": MONTHS[:len(values)],
+        "entity": pd.Categorical(["Consolidated"] * len(values), categories=["Consolidated"]),
+        "cash_usd": np.asarray(values, dtype=np.int64),
+    })
+
+
+def shape_like_load_data(df):
+    """
+    Give a fake combined frame the extras load_data() adds: month-sorted rows
+    on a DatetimeIndex plus categorical month_period and opex_sub columns.
+    """
+    df = df.sort_values("month", kind="stable")
+    df["month_period"] = df["month"].dt.to_period("M").astype("category")
+    labels = df["account_category"].astype(str)
+    df["opex_sub"] = (
+        labels.str.split(":").str[1].where(labels.str.startswith("Opex")).astype("category")
+    )
+    df.index = pd.DatetimeIndex(df["month"].to_numpy())
+    return df
+
+
+@pytest.fixture(scope="session")
+def _base_data():
+    """Fake combined/cash frames, built once per test session."""
+    return make_fake_data()
+
+
+@pytest.fixture(scope="session")
+def fake_columns():
+    """Raw column arrays behind the fake combined frame (treat as read-only)."""
+    return COMBINED_COLUMNS
+
+
+@pytest.fixture(scope="session")
+def loaded_fake_data(_base_data):
+    """Fake combined/cash frames shaped like load_data()'s output (treat as read-only)."""
+    df, cash_df = _base_data
+    return shape_like_load_data(df), cash_df
+
+
+@pytest.fixture
+def fake_data(_base_data):
+    """Per-test shallow copies, so tests can reassign columns freely."""
+    df, cash_df = _base_data
+    return df.copy(deep=False), cash_df.copy(deep=False)
+
+
+@pytest.fixture(scope="session")
+def make_cash():
+    """Builder for brand-new cash frames, for tests that need other balances."""
+    return make_cash_df
+
+
+@pytest.fixture(scope="session")
+def df_no_budget(_base_data):
+    """Fake combined frame without budget rows, filtered once on the type codes."""
+    df, _ = _base_data
+    types = df["type"].cat
+    return df.loc[types.codes != types.categories.get_loc("budget")].reset_index(drop=True)
@@ -0,0 +1,105 @@
+import os
+
+import pandas as pd
+import pytest
+from agent.data_loader import load_data
+
+SHEETS = ("actuals", "budget", "cash", "fx")
+
+
+def write_workbook(path, revenue=1000, note=None, actual_months=("2023-01", "2023-01", "2023-02")):
+    """Small two-month workbook in the fixtures/data.xlsx layout."""
+    actuals = pd.DataFrame({
+        "month": list(actual_months),
+        "entity": ["ParentCo"] * 3,
+        "account_category": ["Revenue", "Opex:Sales", "Revenue"],
+        "amount": [revenue, 200, 1500],
+        "currency": ["USD", "USD", "EUR"],
+    })
+    if note is not None:
+        actuals["note"] = note
+    budget = pd.DataFrame({
+        "month": ["2023-01", "2023-02"],
+        "entity": ["ParentCo"] * 2,
+        "account_category": ["Revenue", "Revenue"],
+        "amount": [1200, 1400],
+        "currency": ["USD", "USD"],
+    })
+    cash = pd.DataFrame({
+        "month": ["2023-01", "2023-02"],
+        "entity": ["Consolidated"] * 2,
+        "cash_usd": [10000, 9000],
+    })
+    fx = pd.DataFrame({
+        "month": ["2023-01", "2023-01", "2023-02", "2023-02"],
+        "currency": ["USD", "EUR", "USD", "EUR"],
+        "rate_to_usd": [1.0, 1.1, 1.0, 1.1],
+    })
+    with pd.ExcelWriter(path) as writer:
+        for name, df in zip(SHEETS, [actuals, budget, cash, fx]):
+            df.to_excel(writer, sheet_name=name, index=False)
+    return path
+
+
+def sidecar(path, name):
+    return path.with_suffix(f".{name}.parquet")
+
+
+def revenue_total(combined):
+    mask = (combined["type"] == "actual") & (combined["account_category"] == "Revenue")
+    return combined.loc[mask, "amount_usd"].sum()
+
+
+def test_sidecar_is_reused(tmp_path, monkeypatch):
+    path = write_workbook(tmp_path / "data.xlsx")
+    combined, cash = load_data(path)
+    assert all(sidecar(path, name).exists() for name in SHEETS)
+
+    # A fresh sidecar means the workbook is not parsed again
+    def fail(*args, **kwargs):
+        raise AssertionError("workbook re-parsed despite a fresh sidecar")
+
+    monkeypatch.setattr(pd, "read_excel", fail)
+    cached_combined, cached_cash = load_data(path)
+    pd.testing.assert_frame_equal(cached_combined, combined)
+    pd.testing.assert_frame_equal(cached_cash, cash)
+
+
+def test_newer_workbook_invalidates_sidecar(tmp_path):
+    path = write_workbook(tmp_path / "data.xlsx")
+    combined, _ = load_data(path)
+    assert revenue_total(combined) == pytest.approx(1000 + 1500 * 1.1)
+
+    write_workbook(path, revenue=3000)
+    stamp = sidecar(path, "actuals").stat().st_mtime + 10
+    os.utime(path, (stamp, stamp))
+    combined, _ = load_data(path)
+    assert revenue_total(combined) == pytest.approx(3000 + 1500 * 1.1)
+
+
+def test_corrupt_sidecar_falls_back_to_workbook(tmp_path):
+    path = write_workbook(tmp_path / "data.xlsx")
+    expected, _ = load_data(path)
+
+    sidecar(path, "actuals").write_bytes(b"not parquet")
+    combined, _ = load_data(path)
+    pd.testing.assert_frame_equal(combined, expected)
+    # ... and the sidecar was rewritten with readable data
+    assert len(pd.read_parquet(sidecar(path, "actuals"))) == 3
+
+
+def test_unwritable_sidecar_still_loads(tmp_path):
+    # Mixed-type column: pyarrow refuses it, caching is skipped
+    path = write_workbook(tmp_path / "data.xlsx", note=["ok", 42, None])
+    combined, cash = load_data(path)
+    assert combined.shape == (5, 7)
+    assert len(cash) == 2
+    assert not sidecar(path, "actuals").exists()
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_unparseable_month_becomes_nat(tmp_path):
+    path = write_workbook(tmp_path / "data.xlsx", actual_months=["2023-01", "TBD", "2023-02"])
+    combined, _ = load_data(path)
+    assert combined.shape == (5, 7)
+    assert combined["month"].isna().sum() == 1
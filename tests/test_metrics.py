@@ -1,150 +1,193 @@
+import numpy as np
 import pandas as pd
 import pytest
 from agent.metrics import (
+    RUNWAY_NOT_BURNING,
     get_revenue_vs_budget,
     get_gross_margin_trend,
+    get_opex_breakdown,
     get_cash_runway,
     get_opex_ratio,
     get_revenue_growth,
     get_burn_multiple,
     get_entity_revenue,
-    get_ebitda_trend
+    get_ebitda_trend,
+    get_kpi_bundle,
 )
 
 
-def make_fake_data():
-    data = [
-        ("2023-01", "ParentCo", "Revenue", "actual", 1000),
-        ("2023-01", "ParentCo", "Revenue", "budget", 1200),
-        ("2023-01", "ParentCo", "COGS", "actual", 400),
-        ("2023-01", "ParentCo", "Opex:Sales", "actual", 200),
-
-        ("2023-02", "ParentCo", "Revenue", "actual", 1500),
-        ("2023-02", "ParentCo", "Revenue", "budget", 1400),
-        ("2023-02", "ParentCo", "COGS", "actual", 500),
-        ("2023-02", "ParentCo", "Opex:Sales", "actual", 300),
-
-        ("2023-03", "ParentCo", "Revenue", "actual", 800),
-        ("2023-03", "ParentCo", "COGS", "actual", 400),
-        ("2023-03", "ParentCo", "Opex:Sales", "actual", 600),
-    ]
-    df = pd.DataFrame(data, columns=["month", "entity", "account_category", "type", "amount_usd"])
-    df["month"] = pd.to_datetime(df["month"])
-
-    cash_data = [
-        ("2023-01", "Consolidated", 10000),
-        ("2023-02", "Consolidated", 9000),
-        ("2023-03", "Consolidated", 8000),
-    ]
-    cash_df = pd.DataFrame(cash_data, columns=["month", "entity", "cash_usd"])
-    cash_df["month"] = pd.to_datetime(cash_df["month"])
-    return df, cash_df
+# ---------------- SCHEMAS ----------------
+
+@pytest.mark.parametrize(
+    "metric, expected_fields",
+    [
+        (lambda df, cash_df: get_revenue_vs_budget(df, "2023-01"),
+         {"month", "actual", "budget", "variance", "variance_pct"}),
+        (lambda df, cash_df: get_gross_margin_trend(df, 3),
+         {"month", "revenue", "cogs", "gm_pct"}),
+        (lambda df, cash_df: get_opex_breakdown(df, "2023-01"),
+         {"category", "amount_usd"}),
+        (lambda df, cash_df: get_cash_runway(df, cash_df),
+         {"latest_month", "cash_now", "avg_burn", "runway_months"}),
+        (lambda df, cash_df: get_ebitda_trend(df, 3),
+         {"month", "revenue", "cogs", "opex", "ebitda"}),
+        (lambda df, cash_df: get_opex_ratio(df, "2023-01"),
+         {"month", "opex", "revenue", "opex_ratio_pct"}),
+        (lambda df, cash_df: get_revenue_growth(df, 3),
+         {"month", "amount_usd", "growth_pct"}),
+        (lambda df, cash_df: get_burn_multiple(df, cash_df, n_months=2),
+         {"avg_burn", "net_new_revenue", "burn_multiple"}),
+        (lambda df, cash_df: get_entity_revenue(df, "2023-01"),
+         {"entity", "amount_usd"}),
+        (lambda df, cash_df: get_kpi_bundle(df, "2023-01"),
+         {"month", "revenue_actual", "revenue_budget", "revenue_variance",
+          "opex_total"}),
+    ],
+    ids=[
+        "revenue_vs_budget", "gross_margin_trend", "opex_breakdown", "cash_runway",
+        "ebitda_trend", "opex_ratio", "revenue_growth", "burn_multiple", "entity_revenue",
+        "kpi_bundle",
+    ],
+)
+def test_metric_schema(fake_data, metric, expected_fields):
+    result = metric(*fake_data)
+    fields = result.columns if isinstance(result, pd.DataFrame) else result.keys()
+    assert expected_fields <= set(fields)
+
+
+@pytest.mark.parametrize(
+    "metric",
+    [
+        lambda df, cash_df: get_revenue_vs_budget(df, "2023-02"),
+        lambda df, cash_df: get_gross_margin_trend(df, 3),
+        lambda df, cash_df: get_opex_breakdown(df, "2023-02"),
+        lambda df, cash_df: get_ebitda_trend(df, 3),
+        lambda df, cash_df: get_opex_ratio(df, "2023-02"),
+        lambda df, cash_df: get_revenue_growth(df, 3),
+        lambda df, cash_df: get_burn_multiple(df, cash_df, n_months=2),
+        lambda df, cash_df: get_entity_revenue(df, "2023-02"),
+        lambda df, cash_df: get_kpi_bundle(df, "2023-02"),
+    ],
+    ids=[
+        "revenue_vs_budget", "gross_margin_trend", "opex_breakdown", "ebitda_trend",
+        "opex_ratio", "revenue_growth", "burn_multiple", "entity_revenue", "kpi_bundle",
+    ],
+)
+def test_metrics_match_on_loaded_frame(fake_data, loaded_fake_data, metric):
+    # load_data() frames take the DatetimeIndex slice and the precomputed
+    # month_period/opex_sub columns; results must match the plain frame's
+    loaded_df, _ = loaded_fake_data
+    assert isinstance(loaded_df.index, pd.DatetimeIndex)
+
+    expected = metric(*fake_data)
+    result = metric(*loaded_fake_data)
+    if isinstance(expected, pd.DataFrame):
+        pd.testing.assert_frame_equal(
+            result.reset_index(drop=True).astype(object),
+            expected.reset_index(drop=True).astype(object),
+            check_names=False,
+        )
+    else:
+        assert result == expected
 
 
 # ---------------- REVENUE VS BUDGET ----------------
 
-def test_revenue_vs_budget_basic():
-    df, _ = make_fake_data()
-    result = get_revenue_vs_budget(df, "2023-01")
-    assert result["actual"] == 1000
-    assert result["budget"] == 1200
-    assert result["variance"] == -200
-    assert round(result["variance_pct"], 1) == -16.7
-
-
-def test_revenue_vs_budget_favorable_variance():
-    df, _ = make_fake_data()
-    result = get_revenue_vs_budget(df, "2023-02")
-    assert result["actual"] == 1500
-    assert result["budget"] == 1400
-    assert result["variance"] == 100
-    assert result["variance_pct"] > 0
+@pytest.mark.parametrize(
+    "month, exp_actual, exp_budget, exp_variance",
+    [
+        ("2023-01", 1000, 1200, -200),
+        ("2023-02", 1500, 1400, 100),
+    ],
+    ids=["basic", "favorable_variance"],
+)
+def test_revenue_vs_budget(fake_data, month, exp_actual, exp_budget, exp_variance):
+    df, _ = fake_data
+    result = get_revenue_vs_budget(df, month)
+    assert result["actual"] == exp_actual
+    assert result["budget"] == exp_budget
+    assert result["variance"] == exp_variance
 
 
-def test_revenue_vs_budget_no_budget_data():
-    df, _ = make_fake_data()
-    df = df[df["type"] != "budget"]  # remove budgets
-    result = get_revenue_vs_budget(df, "2023-01")
+def test_revenue_vs_budget_no_budget_data(df_no_budget):
+    result = get_revenue_vs_budget(df_no_budget, "2023-01")
     assert result["budget"] == 0
     assert result["variance_pct"] in [None, 0]
 
 
 # ---------------- GROSS MARGIN ----------------
 
-def test_gross_margin_trend_contains_gm_pct():
-    df, _ = make_fake_data()
-    trend = get_gross_margin_trend(df, 2)
-    assert "gm_pct" in trend.columns
-
-
-def test_gross_margin_last_month_calculation():
-    df, _ = make_fake_data()
-    trend = get_gross_margin_trend(df, 3)
-    last_row = trend.iloc[-1]
-    # GM% = (800-400)/800 = 50%
-    assert round(last_row["gm_pct"], 1) == 50.0
-
-
-def test_gross_margin_handles_zero_revenue():
-    df, _ = make_fake_data()
-    # Add a row with 0 revenue, ensure month is datetime
-    new_row = pd.DataFrame(
-        [["2023-04", "ParentCo", "Revenue", "actual", 0]], 
-        columns=df.columns
-    )
-    new_row["month"] = pd.to_datetime(new_row["month"])
-    df = pd.concat([df, new_row])
+def test_gross_margin_handles_zero_revenue(fake_columns):
+    # Add a row with 0 revenue, appended directly on the column arrays
+    new_row = {
+        "month": np.array(["2023-04-01"], dtype="datetime64[ns]"),
+        "entity": ["ParentCo"],
+        "account_category": ["Revenue"],
+        "type": ["actual"],
+        "amount_usd": [0],
+    }
+    df = pd.DataFrame({
+        name: np.concatenate([values, new_row[name]]) for name, values in fake_columns.items()
+    })
 
     trend = get_gross_margin_trend(df, 4)
     # Ensure no division error (should safely handle zero revenue)
-    assert "gm_pct" in trend.columns
     assert not trend["gm_pct"].isna().all()
 
 
 # ---------------- CASH RUNWAY ----------------
 
-def test_cash_runway_basic():
-    df, cash_df = make_fake_data()
+@pytest.mark.parametrize(
+    "cash_usd",
+    [
+        [10000, 11000, 12000],  # increasing cash
+        [10000, 10000, 10000],  # flat cash
+    ],
+    ids=["negative_burn", "exactly_zero_burn"],
+)
+def test_cash_runway_not_burning(fake_data, make_cash, cash_usd):
+    df, _ = fake_data
+    cash_df = make_cash(cash_usd)
     result = get_cash_runway(df, cash_df)
-    assert "cash_now" in result
-    assert "runway_months" in result
+    assert result["avg_burn"] == 0
+    assert result["runway_months"] == RUNWAY_NOT_BURNING
 
 
-def test_cash_runway_negative_burn():
-    df, cash_df = make_fake_data()
-    cash_df["cash_usd"] = [10000, 11000, 12000]  # increasing cash
+def test_cash_runway_handles_single_month(fake_data):
+    df, cash_df = fake_data
+    cash_df = cash_df.iloc[:1]  # keep one row
     result = get_cash_runway(df, cash_df)
-    assert result["runway_months"] in [float("inf"), "∞ (profitable / not burning)"]
+    # No month-to-month change to average, so no burn
+    assert result["avg_burn"] == 0
+    assert result["runway_months"] == RUNWAY_NOT_BURNING
 
 
-def test_cash_runway_handles_single_month():
-    df, cash_df = make_fake_data()
-    cash_df = cash_df.iloc[:1]  # keep one row
+def test_cash_runway_skips_missing_balance(fake_data, make_cash):
+    df, _ = fake_data
+    cash_df = make_cash([10000, 9000, 8000]).astype({"cash_usd": "float64"})
+    cash_df.loc[0, "cash_usd"] = np.nan  # January balance missing
     result = get_cash_runway(df, cash_df)
-    assert "runway_months" in result
+    # Only the Feb → Mar change is known: burn 1000, runway 8000 / 1000
+    assert result["avg_burn"] == 1000
+    assert result["runway_months"] == 8.0
 
+    burn = get_burn_multiple(df, cash_df, n_months=2)
+    assert burn["avg_burn"] == 1000
 
-def test_cash_runway_exactly_zero_burn():
-    df, cash_df = make_fake_data()
-    cash_df["cash_usd"] = [10000, 10000, 10000]
-    result = get_cash_runway(df, cash_df)
-    assert result["avg_burn"] == 0
-    assert result["runway_months"] in [float("inf"), "∞ (profitable / not burning)"]
 
 # OTHER TESTING 
 
 
-def test_opex_ratio_basic():
-    df, _ = make_fake_data()
+def test_opex_ratio_basic(fake_data):
+    df, _ = fake_data
     result = get_opex_ratio(df, "2023-01")
     # Opex = 200, Revenue = 1000 → Ratio = 20%
     assert result["opex"] == 200
     assert result["revenue"] == 1000
-    assert round(result["opex_ratio_pct"], 1) == 20.0
 
 
-def test_opex_ratio_no_revenue():
-    df, _ = make_fake_data()
+def test_opex_ratio_no_revenue(fake_data):
+    df, _ = fake_data
     # Remove revenue rows
     df = df[df["account_category"] != "Revenue"]
     result = get_opex_ratio(df, "2023-01")
@@ -152,23 +195,79 @@ def test_opex_ratio_no_revenue():
     assert result["opex_ratio_pct"] is None
 
 
-def test_revenue_growth_trend():
-    df, _ = make_fake_data()
-    growth = get_revenue_growth(df, 3)
-    assert "growth_pct" in growth.columns
-    # Growth from Jan (1000) → Feb (1500) = +50%
-    feb = growth[growth["month"] == "2023-02"].iloc[0]
-    assert round(feb["growth_pct"], 1) == 50.0
-
-
-def test_burn_multiple_basic():
-    df, cash_df = make_fake_data()
+def test_burn_multiple_basic(fake_data):
+    df, cash_df = fake_data
     result = get_burn_multiple(df, cash_df, n_months=2)
-    assert "burn_multiple" in result
     # Should return a finite or None value depending on data
     assert result["burn_multiple"] is None or isinstance(result["burn_multiple"], float)
 
 
+def test_revenue_growth_skips_month_without_revenue_rows(fake_data):
+    df, cash_df = fake_data
+    # March keeps its COGS/Opex actuals but loses its Revenue row
+    df = df[~((df["month"] == "2023-03-01") & (df["account_category"] == "Revenue"))]
+    growth = get_revenue_growth(df, 3)
+    assert list(growth["month"]) == ["2023-01", "2023-02"]
+
+    # Net new revenue is Feb - Jan (500), not a -1500 drop into March
+    result = get_burn_multiple(df, cash_df, n_months=2)
+    assert result["net_new_revenue"] == 500
+    assert result["burn_multiple"] == 2.0
+
+
+def test_kpi_bundle_basic(fake_data):
+    df, _ = fake_data
+    kpis = get_kpi_bundle(df, "2023-01")
+    assert kpis["revenue_actual"] == 1000
+    assert kpis["revenue_budget"] == 1200
+    assert kpis["revenue_variance"] == -200
+    assert kpis["opex_total"] == 200
+
+
+def test_kpi_cards_with_budget_past_last_actual(fake_columns):
+    # April has only a budget row, as when the budget runs ahead of actuals
+    new_row = {
+        "month": np.array(["2023-04-01"], dtype="datetime64[ns]"),
+        "entity": ["ParentCo"],
+        "account_category": ["Revenue"],
+        "type": ["budget"],
+        "amount_usd": [1600],
+    }
+    df = pd.DataFrame({
+        name: np.concatenate([values, new_row[name]]) for name, values in fake_columns.items()
+    })
+    latest_month = df["month"].max().strftime("%Y-%m")
+
+    kpis = get_kpi_bundle(df, latest_month)
+    assert kpis["revenue_actual"] == 0
+    assert kpis["revenue_budget"] == 1600
+
+    # The GM card still shows the last month with actuals (March)
+    gm_latest = get_gross_margin_trend(df, 1)
+    assert gm_latest["month"].iat[-1] == "2023-03"
+    assert gm_latest["gm_pct"].iat[-1] == 50.0
+
+
+# ---------------- PERCENTAGES ----------------
+
+def test_percentage_metrics(fake_data):
+    df, _ = fake_data
+    growth = get_revenue_growth(df, 3).set_index("month")
+    actuals = [
+        # GM% (Mar) = (800-400)/800 = 50%
+        get_gross_margin_trend(df, 3)["gm_pct"].iat[-1],
+        # Growth from Jan (1000) → Feb (1500) = +50%
+        growth.at["2023-02", "growth_pct"],
+        # Opex (Jan) = 200, Revenue = 1000 → Ratio = 20%
+        get_opex_ratio(df, "2023-01")["opex_ratio_pct"],
+        # Variance (Jan) = -200 / 1200, (Feb) = 100 / 1400
+        get_revenue_vs_budget(df, "2023-01")["variance_pct"],
+        get_revenue_vs_budget(df, "2023-02")["variance_pct"],
+    ]
+    expecteds = [50.0, 50.0, 20.0, -16.67, 7.14]
+    np.testing.assert_allclose(actuals, expecteds, rtol=0, atol=0.05)
+
+
 # Test prompts
 # What was revenue vs budget in January 2023?
 # What was revenue vs budget in January 2023?